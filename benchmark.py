@@ -0,0 +1,223 @@
+"""
+性能基准脚本 - 对比各项优化的冷启动开销与稳态收益
+用法:
+    python benchmark.py compile --model "Small (GPU优化)" [--fresh]
+    python benchmark.py features --model "Small (GPU优化)" --batch-size 16
+    python benchmark.py compaction [--corpus 转录txt目录]
+"""
+# 配置需最先导入：在torch/transformers之前设置编译缓存目录
+from config.config import OPTIMIZED_MODELS
+
+import argparse
+import glob
+import os
+import tempfile
+import time
+import gc
+import numpy as np
+import torch
+
+def benchmark_compile(model_key, runs=5, max_new_tokens=32, fresh=False):
+    """
+    对比eager与torch.compile模式的冷启动时间和稳态延迟
+
+    fresh=True时使用临时编译缓存目录，测量真正的冷编译开销；
+    否则使用默认缓存目录，已有编译产物时测得的是重启开销（以编译+预热耗时为准）。
+    """
+    from src.whisper_model import OptimizedWhisperModel
+
+    base_config = OPTIMIZED_MODELS[model_key]
+    batch_size = base_config["batch_size"]
+    partial_batch_size = max(batch_size - 1, 2)
+    results = {}
+
+    compile_config = dict(base_config, compile=True)
+    if fresh:
+        cache_dir = tempfile.mkdtemp(prefix="torch_compile_")
+        os.environ["TORCHINDUCTOR_CACHE_DIR"] = os.path.join(cache_dir, "inductor")
+        compile_config["compile_cache_dir"] = cache_dir
+
+    for compile_enabled in (False, True):
+        mode = "compile" if compile_enabled else "eager"
+        print(f"\n[{mode}] loading {base_config['name']}...")
+
+        start_time = time.time()
+        instance = OptimizedWhisperModel(compile_config if compile_enabled else dict(base_config, compile=False))
+        cold_start = time.time() - start_time
+
+        # 首次运行不计入稳态（eager模式同样需要一次预热）
+        instance.run_dummy_batch(batch_size, max_new_tokens=max_new_tokens)
+
+        # 未预热过的不满批次：若编码器按批次大小重新编译，这里会明显变慢
+        run_start = time.time()
+        instance.run_dummy_batch(partial_batch_size, max_new_tokens=max_new_tokens)
+        partial_batch = time.time() - run_start
+
+        timings = []
+        for _ in range(runs):
+            if torch.cuda.is_available():
+                torch.cuda.synchronize()
+            run_start = time.time()
+            instance.run_dummy_batch(batch_size, max_new_tokens=max_new_tokens)
+            if torch.cuda.is_available():
+                torch.cuda.synchronize()
+            timings.append(time.time() - run_start)
+
+        results[mode] = {
+            "cold_start": cold_start,
+            "compile_time": instance.compile_time,
+            "compiled": instance.compiled,
+            "artifact_loaded": instance.compile_artifact_loaded,
+            "partial_batch": partial_batch,
+            "steady_state": sum(timings) / len(timings),
+        }
+
+        del instance
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    eager, compiled = results["eager"], results["compile"]
+    print(f"""
+⚡ torch.compile 基准 ({model_key}, batch={batch_size}, tokens={max_new_tokens}):
+• 编译产物: {'✅ 已加载' if compiled['artifact_loaded'] else '⚪ 无'}{' [--fresh 临时目录]' if fresh else ''} (仅表示产物文件已加载，是否省下编译时间见编译+预热耗时)
+• eager   冷启动: {eager['cold_start']:.1f}秒, 稳态: {eager['steady_state'] * 1000:.0f}ms/批
+• compile 冷启动: {compiled['cold_start']:.1f}秒 (编译+预热 {compiled['compile_time']:.1f}秒), 稳态: {compiled['steady_state'] * 1000:.0f}ms/批
+• 不满批次(batch={partial_batch_size})首次: eager {eager['partial_batch'] * 1000:.0f}ms, compile {compiled['partial_batch'] * 1000:.0f}ms
+• 编译生效: {'✅' if compiled['compiled'] else '❌ 已回退eager'}
+• 稳态加速: {eager['steady_state'] / compiled['steady_state']:.2f}x
+• 冷启动额外开销: {compiled['cold_start'] - eager['cold_start']:.1f}秒""")
+
+    return results
+
+def benchmark_features(model_key, batch_size=16, runs=10, tolerance=1e-3):
+    """对比HF参考特征提取器与批量向量化提取器的耗时和数值误差"""
+    from transformers import AutoFeatureExtractor
+    from src.feature_extraction import BatchedLogMelExtractor
+
+    feature_extractor = AutoFeatureExtractor.from_pretrained(OPTIMIZED_MODELS[model_key]["name"])
+    batched_extractor = BatchedLogMelExtractor(feature_extractor)
+
+    rng = np.random.default_rng(0)
+    windows = [
+        (rng.standard_normal(feature_extractor.n_samples) * 0.1).astype(np.float32)
+        for _ in range(batch_size)
+    ]
+    # 最后一个窗口模拟不足30秒的尾段
+    windows[-1] = windows[-1][:feature_extractor.n_samples // 3]
+
+    def run_reference():
+        return feature_extractor(
+            windows,
+            sampling_rate=feature_extractor.sampling_rate,
+            return_tensors="np"
+        ).input_features
+
+    def run_batched():
+        return batched_extractor(windows).cpu().numpy()
+
+    reference = run_reference()
+    batched = run_batched()
+    max_diff = float(np.abs(reference - batched).max())
+
+    timings = {}
+    for name, fn in (("reference", run_reference), ("batched", run_batched)):
+        start_time = time.time()
+        for _ in range(runs):
+            fn()
+        timings[name] = (time.time() - start_time) / runs
+
+    print(f"""
+⚡ log-mel特征提取基准 ({model_key}, batch={batch_size}, n_mels={feature_extractor.feature_size}):
+• 参考实现: {timings['reference'] * 1000:.1f}ms/批
+• 批量实现: {timings['batched'] * 1000:.1f}ms/批
+• 加速比: {timings['reference'] / timings['batched']:.2f}x
+• 最大绝对误差: {max_diff:.2e} ({'✅' if max_diff <= tolerance else '❌'} 容差 {tolerance:.0e})""")
+
+    return {"timings": timings, "max_diff": max_diff}
+
+def benchmark_compaction(corpus_dir=None, token_budget=None):
+    """离线评估总结前文本压缩：节省的token、超预算文件数和耗时"""
+    from src.text_compaction import compact_transcript
+    from src.transcript_store import iter_transcripts
+    from config.config import SUMMARY_TOKEN_BUDGET
+
+    token_budget = token_budget or SUMMARY_TOKEN_BUDGET
+
+    # 未指定语料目录时使用转录存档
+    if corpus_dir:
+        documents = []
+        for path in sorted(glob.glob(os.path.join(corpus_dir, "**", "*.txt"), recursive=True)):
+            with open(path, "r", encoding="utf-8") as f:
+                documents.append((os.path.relpath(path, corpus_dir), f.read()))
+    else:
+        documents = [(f"{name} [{model}]", text) for name, model, text in iter_transcripts()]
+
+    if not documents:
+        print("❌ 没有可评估的转录文本")
+        return None
+
+    original_total = compacted_total = 0
+    over_budget_before = over_budget_after = 0
+    elapsed_total = 0.0
+
+    for name, text in documents:
+        start_time = time.time()
+        result = compact_transcript(text, token_budget=token_budget)
+        elapsed = time.time() - start_time
+
+        original_total += result["original_tokens"]
+        compacted_total += result["compacted_tokens"]
+        over_budget_before += result["original_tokens"] > token_budget
+        over_budget_after += len(result["chunks"]) > 1
+        elapsed_total += elapsed
+
+        print(f"• {name}: {result['original_tokens']} → {result['compacted_tokens']} tokens, "
+              f"{len(result['chunks'])}块, {elapsed * 1000:.1f}ms")
+
+    saved_percent = (original_total - compacted_total) / max(original_total, 1) * 100
+    print(f"""
+⚡ 总结前文本压缩基准 ({len(documents)}篇, 预算 {token_budget} tokens):
+• 原文tokens(估算): {original_total}
+• 压缩后tokens: {compacted_total} (节省 {saved_percent:.1f}%)
+• 超预算篇数: {over_budget_before} → {over_budget_after} (仍需分块)
+• 平均耗时: {elapsed_total / len(documents) * 1000:.1f}ms/篇""")
+
+    return {
+        "documents": len(documents),
+        "original_tokens": original_total,
+        "compacted_tokens": compacted_total,
+        "over_budget_before": over_budget_before,
+        "over_budget_after": over_budget_after,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper优化性能基准")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = subparsers.add_parser("compile", help="torch.compile冷启动与稳态对比")
+    compile_parser.add_argument("--model", default="Small (GPU优化)", choices=list(OPTIMIZED_MODELS.keys()))
+    compile_parser.add_argument("--runs", type=int, default=5)
+    compile_parser.add_argument("--tokens", type=int, default=32)
+    compile_parser.add_argument("--fresh", action="store_true", help="使用临时编译缓存目录，测量冷编译开销")
+
+    features_parser = subparsers.add_parser("features", help="批量log-mel特征提取与参考实现对比")
+    features_parser.add_argument("--model", default="Small (GPU优化)", choices=list(OPTIMIZED_MODELS.keys()))
+    features_parser.add_argument("--batch-size", type=int, default=16)
+    features_parser.add_argument("--runs", type=int, default=10)
+
+    compaction_parser = subparsers.add_parser("compaction", help="总结前文本压缩离线评估")
+    compaction_parser.add_argument("--corpus", default=None, help="转录txt目录，默认使用转录存档")
+    compaction_parser.add_argument("--budget", type=int, default=None)
+
+    args = parser.parse_args()
+
+    if args.command == "compile":
+        benchmark_compile(args.model, runs=args.runs, max_new_tokens=args.tokens, fresh=args.fresh)
+    elif args.command == "features":
+        benchmark_features(args.model, batch_size=args.batch_size, runs=args.runs)
+    elif args.command == "compaction":
+        benchmark_compaction(args.corpus, token_budget=args.budget)
+
+if __name__ == "__main__":
+    main()
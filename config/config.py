@@ -1,6 +1,18 @@
 """
 配置文件 - 存储所有配置常量和设置
 """
+import os
+
+# torch.compile编译缓存目录：必须在导入torch/transformers之前设置环境变量，
+# 否则transformers导入时torch会把默认值 /tmp/torchinductor_<user> 写入环境变量；
+# 用户显式设置的环境变量保持不变
+TORCH_COMPILE_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "torch_compile"
+)
+os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", os.path.join(TORCH_COMPILE_CACHE_DIR, "inductor"))
+os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+os.environ.setdefault("TORCHINDUCTOR_AUTOGRAD_CACHE", "1")
+
 import torch
 
 # DeepSeek API配置
@@ -15,26 +27,43 @@ TORCH_DTYPE = torch.float16 if torch.cuda.is_available() else torch.float32
 OPTIMIZED_MODELS = {
     "Small (GPU优化)": {
         "name": "openai/whisper-small",
-        "batch_size": 16
+        "batch_size": 16,
+        "compile": False,  # 是否启用torch.compile（首次启动需编译，编译缓存可缩短重启时的编译时间）
+        "batched_features": False  # 是否使用批量向量化log-mel特征提取（解码方式不变）
     },
     "Medium (高利用率)": {
         "name": "openai/whisper-medium", 
-        "batch_size": 8
+        "batch_size": 8,
+        "compile": False,
+        "batched_features": False
     },
     "Large-v3 (最大化GPU)": {
         "name": "openai/whisper-large-v3",
-        "batch_size": 4
+        "batch_size": 4,
+        "compile": False,
+        "batched_features": False
     }
 }
 
+GENERATE_MAX_NEW_TOKENS = 200  # 每个30秒窗口最多生成的token数（pipeline与批量特征路径共用）
+
+# torch.compile配置
+TORCH_COMPILE_MODE = "default"  # 可选: "default", "reduce-overhead", "max-autotune"
+COMPILE_WARMUP_TOKENS = 8  # 预热时每个批次生成的token数
+
 # API配置
 DEEPSEEK_API_URL = "https://api.deepseek.com/chat/completions"
 DEEPSEEK_MODEL = "deepseek-reasoner"
+SUMMARY_TOKEN_BUDGET = 48000  # 单次总结请求中转录文本的token上限（预留提示词和输出空间）
 
 # 文件配置
 DEFAULT_TRANSCRIPT_PREFIX = "transcript_optimized"
 DEFAULT_SUMMARY_PREFIX = "ai_summary"
 SUPPORTED_FILE_TYPES = ["audio", "video"]
+TRANSCRIPT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "transcripts.db"
+)
+SEARCH_RESULT_LIMIT = 50
 
 # 界面配置
 APP_TITLE = "GPU高利用率Whisper"
@@ -2,15 +2,18 @@
 主程序 - GPU高利用率Whisper转录应用
 重构后的模块化版本
 """
+# 配置需最先导入：在torch/transformers之前设置编译缓存目录
+from config.config import OPTIMIZED_MODELS, APP_TITLE, APP_PORT, MAX_FILE_SIZE, DEEPSEEK_API_KEY
+
 import gradio as gr
 import torch
 
 # 导入自定义模块
-from config.config import OPTIMIZED_MODELS, APP_TITLE, APP_PORT, MAX_FILE_SIZE, DEEPSEEK_API_KEY
 from src.utils import get_gpu_info, monitor_gpu_usage
 from src.whisper_model import transcribe_high_utilization, clear_all_cache
 from src.ai_summary import summarize_with_deepseek
 from src.file_operations import save_transcript_with_dialog, save_summary_with_dialog
+from src.transcript_store import search_transcripts_table
 from src.ui_components import create_system_status_html, create_api_status_components, create_performance_info
 
 def main():
@@ -120,6 +123,23 @@ def main():
                     visible=False
                 )
         
+        # 转录归档搜索
+        with gr.Accordion("🔍 转录归档搜索", open=False):
+            with gr.Row():
+                search_input = gr.Textbox(
+                    label="关键词",
+                    placeholder="输入要查找的词语，多个关键词用空格分隔",
+                    scale=4
+                )
+                search_btn = gr.Button("🔍 搜索", variant="primary", scale=1)
+            
+            search_output = gr.Dataframe(
+                headers=["文件", "模型", "转录时间", "开始(ms)", "结束(ms)", "匹配片段"],
+                datatype=["str", "str", "str", "number", "number", "str"],
+                interactive=False,
+                wrap=True
+            )
+        
         # 性能说明
         with gr.Accordion("⚡ GPU优化说明", open=False):
             gr.Markdown(create_performance_info())
@@ -147,6 +167,19 @@ def main():
                 outputs=[gpu_monitor]
             )
             
+            # 转录归档搜索
+            search_btn.click(
+                fn=search_transcripts_table,
+                inputs=[search_input],
+                outputs=[search_output]
+            )
+            
+            search_input.submit(
+                fn=search_transcripts_table,
+                inputs=[search_input],
+                outputs=[search_output]
+            )
+            
             # 保存转录文本
             save_btn.click(
                 fn=save_transcript_with_dialog,
@@ -4,6 +4,83 @@ AI总结模块 - 处理DeepSeek AI文本总结功能
 import requests
 import json
 from config.config import DEEPSEEK_API_KEY, DEEPSEEK_API_URL, DEEPSEEK_MODEL
+from src.text_compaction import compact_transcript
+
+def _call_deepseek(prompt, api_key):
+    """发送单次DeepSeek请求，返回模型输出；失败时抛出RuntimeError"""
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}"
+    }
+    
+    data = {
+        "model": DEEPSEEK_MODEL,
+        "messages": [
+            {
+                "role": "user", 
+                "content": prompt
+            }
+        ],
+        "max_tokens": 2000,
+        "temperature": 0.3,
+        "stream": False
+    }
+    
+    # 发送请求
+    response = requests.post(DEEPSEEK_API_URL, headers=headers, json=data, timeout=60)
+    
+    if response.status_code == 200:
+        result = response.json()
+        if "choices" in result and len(result["choices"]) > 0:
+            return result["choices"][0]["message"]["content"].strip()
+        raise RuntimeError("API返回格式错误")
+    
+    error_detail = ""
+    try:
+        error_info = response.json()
+        if "error" in error_info:
+            error_detail = f": {error_info['error'].get('message', '')}"
+    except:
+        pass
+    raise RuntimeError(f"API请求失败 (状态码: {response.status_code}){error_detail}")
+
+def _build_summary_prompt(text):
+    """构建总结提示词"""
+    return f"""请对以下转录文本进行简洁的总结，要求：
+1. 提取主要观点和关键信息
+2. 保持逻辑清晰，条理分明
+3. 总结长度控制在原文的1/3以内
+4. 使用中文输出
+
+转录文本：
+{text}
+
+请开始总结："""
+
+def _build_chunk_prompt(text, index, total):
+    """构建分块总结提示词"""
+    return f"""以下是一段长转录文本的第{index}/{total}部分，请提取这一部分的主要观点和关键信息，
+条理清晰，使用中文输出。
+
+转录文本片段：
+{text}
+
+请开始总结："""
+
+def _build_merge_prompt(chunk_summaries):
+    """构建分块总结合并提示词"""
+    joined = "\n\n".join(
+        f"【第{i}部分】\n{summary}" for i, summary in enumerate(chunk_summaries, start=1)
+    )
+    return f"""以下是同一段转录文本按顺序分块后的各部分总结，请整合为一份完整、简洁的总结，要求：
+1. 去除各部分之间的重复内容
+2. 保持逻辑清晰，条理分明
+3. 使用中文输出
+
+各部分总结：
+{joined}
+
+请开始总结："""
 
 def summarize_with_deepseek(text_with_info, user_api_key=""):
     """使用DeepSeek R1进行文本总结"""
@@ -25,47 +102,24 @@ def summarize_with_deepseek(text_with_info, user_api_key=""):
     if not pure_text or len(pure_text.strip()) < 50:
         return "❌ 文本内容太短，无法进行有效总结"
     
+    # 总结前压缩：折叠重复、删除填充词、去重，仍超预算时才分块
+    compaction = compact_transcript(pure_text)
+    chunks = compaction["chunks"]
+    
     try:
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}"
-        }
-        
-        # 构建提示词
-        prompt = f"""请对以下转录文本进行简洁的总结，要求：
-1. 提取主要观点和关键信息
-2. 保持逻辑清晰，条理分明
-3. 总结长度控制在原文的1/3以内
-4. 使用中文输出
-
-转录文本：
-{pure_text}
-
-请开始总结："""
-        
-        data = {
-            "model": DEEPSEEK_MODEL,
-            "messages": [
-                {
-                    "role": "user", 
-                    "content": prompt
-                }
-            ],
-            "max_tokens": 2000,
-            "temperature": 0.3,
-            "stream": False
-        }
+        if len(chunks) == 1:
+            summary = _call_deepseek(_build_summary_prompt(chunks[0]), api_key)
+        else:
+            chunk_summaries = [
+                _call_deepseek(_build_chunk_prompt(chunk, i, len(chunks)), api_key)
+                for i, chunk in enumerate(chunks, start=1)
+            ]
+            summary = _call_deepseek(_build_merge_prompt(chunk_summaries), api_key)
         
-        # 发送请求
-        response = requests.post(DEEPSEEK_API_URL, headers=headers, json=data, timeout=60)
+        saved_percent = compaction["saved_tokens"] / max(compaction["original_tokens"], 1) * 100
         
-        if response.status_code == 200:
-            result = response.json()
-            if "choices" in result and len(result["choices"]) > 0:
-                summary = result["choices"][0]["message"]["content"].strip()
-                
-                # 添加总结信息
-                summary_info = f"""
+        # 添加总结信息
+        summary_info = f"""
 📝 AI总结 (DeepSeek R1):
 {summary}
 
@@ -74,24 +128,17 @@ def summarize_with_deepseek(text_with_info, user_api_key=""):
 • 原文长度: {len(pure_text)} 字符
 • 总结长度: {len(summary)} 字符
 • 压缩比例: {len(summary)/len(pure_text)*100:.1f}%
+• 输入tokens(估算): {compaction['original_tokens']} → {compaction['compacted_tokens']} (节省 {saved_percent:.1f}%)
+• 分块数: {len(chunks)}
 • 模型: DeepSeek R1 Reasoner
 """
-                return summary_info
-            else:
-                return "❌ API返回格式错误"
-        else:
-            error_detail = ""
-            try:
-                error_info = response.json()
-                if "error" in error_info:
-                    error_detail = f": {error_info['error'].get('message', '')}"
-            except:
-                pass
-            return f"❌ API请求失败 (状态码: {response.status_code}){error_detail}"
+        return summary_info
             
     except requests.exceptions.Timeout:
         return "❌ 请求超时，请检查网络连接"
     except requests.exceptions.RequestException as e:
         return f"❌ 网络请求失败: {str(e)}"
+    except RuntimeError as e:
+        return f"❌ {str(e)}"
     except Exception as e:
-        return f"❌ 总结失败: {str(e)}"
\ No newline at end of file
+        return f"❌ 总结失败: {str(e)}"
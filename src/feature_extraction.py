@@ -0,0 +1,125 @@
+"""
+特征提取模块 - 批量向量化计算Whisper log-mel特征
+"""
+import threading
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+class BatchedLogMelExtractor:
+    """整批30秒窗口一次性计算STFT和mel投影，结果与HF WhisperFeatureExtractor一致"""
+
+    def __init__(self, feature_extractor, device="cpu"):
+        self.sampling_rate = feature_extractor.sampling_rate
+        self.n_fft = feature_extractor.n_fft
+        self.hop_length = feature_extractor.hop_length
+        self.n_samples = feature_extractor.n_samples
+        self.nb_max_frames = feature_extractor.nb_max_frames
+        self.n_mels = feature_extractor.feature_size
+        self.device = torch.device(device)
+
+        # 每个窗口带上STFT所需的上下文：左侧n_fft//2，右侧补足最后一帧
+        self.pad = self.n_fft // 2
+        self.segment_length = self.n_samples + self.n_fft - self.hop_length
+
+        # 预计算窗函数和mel滤波器组: (n_mels, n_freqs)
+        self.window = torch.hann_window(self.n_fft, device=self.device)
+        self.mel_filters = torch.from_numpy(
+            np.asarray(feature_extractor.mel_filters, dtype=np.float32)
+        ).T.contiguous().to(self.device)
+
+        self._segment_buffer = None
+        self._output_buffer = None
+        # Gradio可能并发处理多个请求，缓冲区在extract期间加锁独占
+        self._lock = threading.Lock()
+
+    def _get_buffers(self, batch_size):
+        """获取可复用的输入/输出缓冲区，批次变大时才重新分配"""
+        if self._segment_buffer is None or self._segment_buffer.shape[0] < batch_size:
+            self._segment_buffer = torch.empty(batch_size, self.segment_length, device=self.device)
+            self._output_buffer = torch.empty(batch_size, self.n_mels, self.nb_max_frames, device=self.device)
+
+        return self._segment_buffer[:batch_size], self._output_buffer[:batch_size]
+
+    def _log_mel(self, segments, output):
+        """对一批带上下文的窗口计算log10 mel谱，写入output (batch, n_mels, nb_max_frames)"""
+        stft = torch.stft(
+            segments,
+            self.n_fft,
+            self.hop_length,
+            window=self.window,
+            center=False,
+            return_complex=True
+        )
+        magnitudes = stft.abs() ** 2
+
+        torch.bmm(self.mel_filters.expand(segments.shape[0], -1, -1), magnitudes, out=output)
+        return output.clamp_(min=1e-10).log10_()
+
+    @staticmethod
+    def _normalize(log_spec, dims):
+        """与参考实现一致：压缩动态范围到8个数量级后缩放"""
+        max_val = log_spec.amax(dim=dims, keepdim=True)
+        torch.maximum(log_spec, max_val - 8.0, out=log_spec)
+        return log_spec.add_(4.0).div_(4.0)
+
+    def __call__(self, windows):
+        """
+        计算一批30秒窗口的log-mel特征（每个窗口单独归一化）
+
+        windows: 16kHz单声道波形列表，每个不超过30秒，不足部分补零
+        返回 (batch, n_mels, nb_max_frames) 的float32张量。
+        注意：返回值复用内部缓冲区，下一次调用前需使用完毕。
+        """
+        segments, output = self._get_buffers(len(windows))
+        pad, n_samples = self.pad, self.n_samples
+        tail = self.segment_length - pad - n_samples
+
+        segments.zero_()
+        for i, window in enumerate(windows):
+            length = min(len(window), n_samples)
+            segments[i, pad:pad + length].copy_(
+                torch.from_numpy(np.array(window[:length], dtype=np.float32))
+            )
+
+        # 两端反射填充，等价于参考实现中 center=True 的STFT
+        segments[:, :pad] = segments[:, pad + 1:2 * pad + 1].flip(-1)
+        segments[:, pad + n_samples:] = segments[:, pad + n_samples - tail - 1:pad + n_samples - 1].flip(-1)
+
+        return self._normalize(self._log_mel(segments, output), dims=(1, 2))
+
+    def extract(self, audio, batch_size=8):
+        """
+        按pipeline的方式计算整段音频的输入特征
+
+        不超过30秒时补零到30秒，返回 (features, None)；
+        更长的音频与HF long-form输入一致（不截断，全局归一化），
+        按30秒窗口整批计算后拼接，返回 (features, attention_mask)。
+        返回的特征不共享内部缓冲区，可在并发请求中安全使用。
+        """
+        with self._lock:
+            return self._extract(audio, batch_size)
+
+    def _extract(self, audio, batch_size):
+        """extract的实现，调用方需持有缓冲区锁"""
+        if len(audio) <= self.n_samples:
+            return self([audio]).clone(), None
+
+        num_frames = len(audio) // self.hop_length
+        num_windows = -(-num_frames // self.nb_max_frames)
+
+        waveform = torch.from_numpy(np.array(audio, dtype=np.float32)).to(self.device)
+        padded = F.pad(waveform.view(1, 1, -1), (self.pad, self.pad), mode="reflect").view(-1)
+        padded = F.pad(padded, (0, max(0, (num_windows - 1) * self.n_samples + self.segment_length - padded.shape[0])))
+        windows = padded.unfold(0, self.segment_length, self.n_samples)
+
+        log_spec = torch.empty(num_windows, self.n_mels, self.nb_max_frames, device=self.device)
+        for start in range(0, num_windows, batch_size):
+            segments, output = self._get_buffers(min(batch_size, num_windows - start))
+            segments.copy_(windows[start:start + segments.shape[0]])
+            log_spec[start:start + segments.shape[0]] = self._log_mel(segments, output)
+
+        features = log_spec.permute(1, 0, 2).reshape(self.n_mels, -1)[:, :num_frames].unsqueeze(0).contiguous()
+        attention_mask = torch.ones(1, num_frames, dtype=torch.long, device=self.device)
+
+        return self._normalize(features, dims=(1, 2)), attention_mask
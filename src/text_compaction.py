@@ -0,0 +1,179 @@
+"""
+文本压缩模块 - 总结前按token预算压缩转录文本
+"""
+import re
+from difflib import SequenceMatcher
+from config.config import SUMMARY_TOKEN_BUDGET
+
+# DeepSeek官方估算：1个中文字符约0.6 token，1个英文字符约0.3 token
+_CJK_TOKEN_RATIO = 0.6
+_OTHER_TOKEN_RATIO = 0.3
+
+# 中日韩字符（假名、汉字、谚文），token估算与转录存档的逐字索引共用
+CJK_CHAR_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+
+# Whisper幻觉循环：单字连续4次以上保留两次，短语连续3次以上保留一次（不处理数字和标点）
+_CHAR_REPETITION_PATTERN = re.compile(r"([^\W\d_])\1{3,}")
+_WORD_CHAR_PATTERN = re.compile(r"[^\W\d_]")
+_PHRASE_REPETITION_PATTERN = re.compile(r"((?:(?!\d).){2,30}?)(?:[\s，,、。.]*\1){2,}", re.S)
+# 以“.”或“/”紧贴字母数字的重复（网址、路径、版本号）不是识别循环
+_GLUED_PATTERN = re.compile(r"[A-Za-z0-9][./][A-Za-z0-9]")
+
+_FILLER_WORDS = r"(?:嗯|呃|额|唔|啊|哦|um+|uh+|erm|hmm+)"
+# 单独成句的填充词（如“啊？”“嗯。”）：连同句末标点一起删除
+_FILLER_SENTENCE_PATTERN = re.compile(
+    r"(^|[。.！!？?；;][ \t]*)" + _FILLER_WORDS + r"(?:[\s，,、]*" + _FILLER_WORDS + r")*[\s，,、]*[。.！!？?；;]+[ \t]*",
+    re.I | re.M
+)
+# 句中独立出现的语气填充词：前面是开头/标点/空白，后面是分隔符（一并删除）或句末标点
+_FILLER_PATTERN = re.compile(
+    r"(^|[\s，,。.！!？?、；;])(?:" + _FILLER_WORDS + r"(?:[\s，,、]+|(?=[。.！!？?；;]|$)))+",
+    re.I | re.M
+)
+# 删除填充词后残留的多余标点
+_DANGLING_PUNCT_PATTERN = re.compile(r"[，,、]+\s*(?=[。.！!？?；;，,、])")
+_DUPLICATE_PUNCT_PATTERN = re.compile(r"([。！？；])\1+")
+
+_SENTENCE_DELIMITER = re.compile(r"([。！？!?；;\n]+)")
+# 单句超预算时的次级切分点：逗号、顿号和空白
+_CLAUSE_DELIMITER = re.compile(r"([，,、\s]+)")
+_NORMALIZE_PATTERN = re.compile(r"[\W_]+")
+
+# 去重时向前比较的句子数、相似度阈值和最短句长
+_DEDUP_WINDOW = 8
+_DEDUP_THRESHOLD = 0.9
+_DEDUP_MIN_LENGTH = 6
+
+def _token_cost(text):
+    """按字符类别计算未取整的token估算值"""
+    cjk_count = len(CJK_CHAR_PATTERN.findall(text))
+    other_count = len(re.sub(r"\s", "", text)) - cjk_count
+    return cjk_count * _CJK_TOKEN_RATIO + other_count * _OTHER_TOKEN_RATIO
+
+def estimate_tokens(text):
+    """按字符类别估算token数"""
+    if not text:
+        return 0
+    return int(_token_cost(text) + 0.5)
+
+def collapse_repetitions(text):
+    """折叠重复循环，如“谢谢谢谢谢谢”“好的好的好的”"""
+    text = _CHAR_REPETITION_PATTERN.sub(r"\1\1", text)
+    return _PHRASE_REPETITION_PATTERN.sub(_collapse_phrase, text)
+
+def _collapse_phrase(match):
+    """不含文字的重复单元（省略号、破折号等）和网址/路径中的重复保持原样"""
+    repeated = match.group(0)
+    if not _WORD_CHAR_PATTERN.search(match.group(1)) or _GLUED_PATTERN.search(repeated):
+        return repeated
+    return match.group(1)
+
+def remove_fillers(text):
+    """删除独立的语气填充词"""
+    text = _FILLER_SENTENCE_PATTERN.sub(r"\1", text)
+    text = _FILLER_PATTERN.sub(r"\1", text)
+    text = _DANGLING_PUNCT_PATTERN.sub("", text)
+    return _DUPLICATE_PUNCT_PATTERN.sub(r"\1", text)
+
+def _split_pieces(text, pattern):
+    """按分隔符切分，分隔符保留在前一段末尾"""
+    parts = pattern.split(text)
+    return [parts[i] + (parts[i + 1] if i + 1 < len(parts) else "") for i in range(0, len(parts), 2)]
+
+def split_sentences(text):
+    """按句末标点和换行切分，标点保留在句尾"""
+    return [sentence for sentence in _split_pieces(text, _SENTENCE_DELIMITER) if sentence.strip()]
+
+def deduplicate_sentences(sentences):
+    """删除与最近若干句几乎相同的句子（分块重叠、重复识别）"""
+    kept = []
+    recent = []
+    for sentence in sentences:
+        normalized = _NORMALIZE_PATTERN.sub("", sentence).lower()
+        if len(normalized) >= _DEDUP_MIN_LENGTH and any(
+            normalized == previous or SequenceMatcher(None, normalized, previous).ratio() >= _DEDUP_THRESHOLD
+            for previous in recent
+        ):
+            continue
+
+        kept.append(sentence)
+        if normalized:
+            recent = (recent + [normalized])[-_DEDUP_WINDOW:]
+    return kept
+
+def _hard_split(text, token_budget):
+    """按字符数硬切，每段估算token不超过预算"""
+    pieces = []
+    current = ""
+    current_cost = 0.0
+    for char in text:
+        char_cost = _token_cost(char)
+        if current and current_cost + char_cost > token_budget:
+            pieces.append(current)
+            current = ""
+            current_cost = 0.0
+        current += char
+        current_cost += char_cost
+
+    if current:
+        pieces.append(current)
+    return pieces
+
+def _split_to_budget(sentence, token_budget):
+    """超预算的句子先按逗号/空白切分，仍超预算的片段再按字符数硬切"""
+    if _token_cost(sentence) <= token_budget:
+        return [sentence]
+
+    pieces = []
+    for clause in _split_pieces(sentence, _CLAUSE_DELIMITER):
+        if _token_cost(clause) <= token_budget:
+            pieces.append(clause)
+        else:
+            pieces.extend(_hard_split(clause, token_budget))
+    return pieces
+
+def chunk_sentences(sentences, token_budget):
+    """按token预算将句子分组，仅在压缩后仍超预算时使用；保证每块估算token不超过预算"""
+    chunks = []
+    current = []
+    current_cost = 0.0
+    for sentence in sentences:
+        for piece in _split_to_budget(sentence, token_budget):
+            piece_cost = _token_cost(piece)
+            if current and current_cost + piece_cost > token_budget:
+                chunks.append("".join(current).strip())
+                current = []
+                current_cost = 0.0
+            current.append(piece)
+            current_cost += piece_cost
+
+    if current:
+        chunks.append("".join(current).strip())
+    return [chunk for chunk in chunks if chunk]
+
+def compact_transcript(text, token_budget=SUMMARY_TOKEN_BUDGET):
+    """
+    总结前压缩转录文本：折叠重复循环、删除填充词、去除近似重复句，
+    仍超出token预算时再按预算分块
+
+    返回 {"text", "chunks", "original_tokens", "compacted_tokens", "saved_tokens"}
+    """
+    original_tokens = estimate_tokens(text)
+
+    compacted = remove_fillers(collapse_repetitions(text))
+    sentences = deduplicate_sentences(split_sentences(compacted))
+    compacted = "".join(sentences).strip()
+    compacted_tokens = estimate_tokens(compacted)
+
+    if compacted_tokens > token_budget:
+        chunks = chunk_sentences(sentences, token_budget)
+    else:
+        chunks = [compacted]
+
+    return {
+        "text": compacted,
+        "chunks": chunks,
+        "original_tokens": original_tokens,
+        "compacted_tokens": compacted_tokens,
+        "saved_tokens": original_tokens - compacted_tokens
+    }
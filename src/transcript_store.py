@@ -0,0 +1,167 @@
+"""
+转录存档模块 - 基于SQLite FTS5的本地转录全文索引与检索
+"""
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import closing
+from config.config import TRANSCRIPT_DB_PATH, SEARCH_RESULT_LIMIT
+from src.text_compaction import CJK_CHAR_PATTERN
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY,
+    source_name TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    language TEXT,
+    created_at REAL NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transcripts_source ON transcripts(source_hash, model);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    transcript_id INTEGER NOT NULL REFERENCES transcripts(id) ON DELETE CASCADE,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_segments_transcript ON segments(transcript_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(content, tokenize='unicode61');
+"""
+
+def _tokenize_cjk(text):
+    """
+    在中日韩字符两侧插入空格，实现逐字索引
+
+    逐字切分后再交给unicode61分词器，使任意长度的中文词都能检索
+    """
+    return " ".join(CJK_CHAR_PATTERN.sub(r" \g<0> ", text).split())
+
+def _build_match_query(query):
+    """将用户输入转换为FTS5短语查询，各关键词之间为AND关系"""
+    phrases = []
+    for term in query.split():
+        tokens = _tokenize_cjk(term)
+        if tokens:
+            phrases.append('"' + tokens.replace('"', '""') + '"')
+    return " ".join(phrases)
+
+def _connect(db_path=None):
+    """打开数据库连接并确保表结构存在"""
+    db_path = db_path or TRANSCRIPT_DB_PATH
+    db_dir = os.path.dirname(db_path)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(_SCHEMA)
+    return conn
+
+def compute_source_hash(file_path, chunk_size=1024 * 1024):
+    """计算源文件的SHA-256"""
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+def save_transcript(source_path, model, text, segments, language=None, db_path=None):
+    """
+    将一次完整转录写入存档，同一文件同一模型的旧记录会被替换
+
+    segments: [{"start_ms": int, "end_ms": int, "text": str}, ...]
+    返回新记录的transcript_id
+    """
+    source_hash = compute_source_hash(source_path)
+
+    with closing(_connect(db_path)) as conn, conn:
+        old_ids = [row[0] for row in conn.execute(
+            "SELECT id FROM transcripts WHERE source_hash = ? AND model = ?",
+            (source_hash, model)
+        )]
+        for old_id in old_ids:
+            conn.execute(
+                "DELETE FROM segments_fts WHERE rowid IN (SELECT id FROM segments WHERE transcript_id = ?)",
+                (old_id,)
+            )
+            conn.execute("DELETE FROM transcripts WHERE id = ?", (old_id,))
+
+        cursor = conn.execute(
+            "INSERT INTO transcripts (source_name, source_hash, model, language, created_at, text) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (os.path.basename(source_path), source_hash, model, language, time.time(), text)
+        )
+        transcript_id = cursor.lastrowid
+
+        for segment in segments:
+            segment_text = segment["text"].strip()
+            if not segment_text:
+                continue
+
+            cursor = conn.execute(
+                "INSERT INTO segments (transcript_id, start_ms, end_ms, text) VALUES (?, ?, ?, ?)",
+                (transcript_id, segment["start_ms"], segment["end_ms"], segment_text)
+            )
+            conn.execute(
+                "INSERT INTO segments_fts (rowid, content) VALUES (?, ?)",
+                (cursor.lastrowid, _tokenize_cjk(segment_text))
+            )
+
+    return transcript_id
+
+def search_transcripts(query, limit=SEARCH_RESULT_LIMIT, db_path=None):
+    """
+    在全部存档中检索匹配片段，按相关度排序
+
+    返回 [{"transcript_id", "source_name", "model", "created_at",
+           "start_ms", "end_ms", "text"}, ...]
+    """
+    match_query = _build_match_query(query or "")
+    if not match_query:
+        return []
+
+    with closing(_connect(db_path)) as conn:
+        rows = conn.execute(
+            """
+            SELECT t.id, t.source_name, t.model, t.created_at, s.start_ms, s.end_ms, s.text
+            FROM segments_fts
+            JOIN segments s ON s.id = segments_fts.rowid
+            JOIN transcripts t ON t.id = s.transcript_id
+            WHERE segments_fts MATCH ?
+            ORDER BY bm25(segments_fts), t.created_at DESC, s.start_ms
+            LIMIT ?
+            """,
+            (match_query, limit)
+        ).fetchall()
+
+    keys = ["transcript_id", "source_name", "model", "created_at", "start_ms", "end_ms", "text"]
+    return [dict(zip(keys, row)) for row in rows]
+
+def iter_transcripts(db_path=None):
+    """遍历存档中的全部转录，产出 (source_name, model, text)"""
+    with closing(_connect(db_path)) as conn:
+        for row in conn.execute("SELECT source_name, model, text FROM transcripts ORDER BY id"):
+            yield row
+
+def search_transcripts_table(query, limit=SEARCH_RESULT_LIMIT):
+    """为Gradio表格组件格式化检索结果"""
+    try:
+        hits = search_transcripts(query, limit=limit)
+    except sqlite3.Error as e:
+        print(f"转录检索失败: {e}")
+        return []
+
+    return [
+        [
+            hit["source_name"],
+            hit["model"],
+            time.strftime("%Y-%m-%d %H:%M", time.localtime(hit["created_at"])),
+            hit["start_ms"],
+            hit["end_ms"],
+            hit["text"]
+        ]
+        for hit in hits
+    ]
@@ -2,6 +2,7 @@
 工具函数模块 - 系统检测和通用工具函数
 """
 import subprocess
+import numpy as np
 import torch
 import os
 import tempfile
@@ -73,6 +74,25 @@ def extract_audio_parallel(video_path, start_time=0, duration=None):
         print(f"音频提取失败: {e}")
         return video_path
 
+def load_audio(audio_path, sampling_rate=16000):
+    """使用FFmpeg解码为单声道float32波形"""
+    cmd = [
+        'ffmpeg', '-i', audio_path,
+        '-vn',
+        '-ac', '1',
+        '-ar', str(sampling_rate),
+        '-f', 'f32le',
+        '-threads', '0',
+        '-loglevel', 'error',
+        'pipe:1'
+    ]
+    
+    process = subprocess.run(cmd, capture_output=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"音频解码失败: {process.stderr.decode(errors='ignore')}")
+    
+    return np.frombuffer(process.stdout, dtype=np.float32)
+
 def save_file_dialog(content, title, default_prefix):
     """通用文件保存对话框"""
     if not content or content.startswith("❌"):
@@ -7,8 +7,77 @@ import gc
 import os
 from transformers import pipeline, AutoModelForSpeechSeq2Seq, AutoProcessor
 from concurrent.futures import ThreadPoolExecutor
-from config.config import OPTIMIZED_MODELS, DEVICE, TORCH_DTYPE
-from src.utils import extract_audio_parallel, monitor_gpu_usage
+from config.config import (
+    OPTIMIZED_MODELS, DEVICE, TORCH_DTYPE,
+    TORCH_COMPILE_MODE, TORCH_COMPILE_CACHE_DIR, COMPILE_WARMUP_TOKENS, GENERATE_MAX_NEW_TOKENS
+)
+from src.utils import extract_audio_parallel, monitor_gpu_usage, load_audio
+from src.feature_extraction import BatchedLogMelExtractor
+from src.transcript_store import save_transcript
+
+def _build_segments(chunks):
+    """将带时间戳的分段 [{"timestamp": (start, end), "text"}] 转换为毫秒分段"""
+    segments = []
+    for chunk in chunks:
+        start, end = chunk["timestamp"]
+        start = start or 0.0
+        end = end if end is not None else start
+        segments.append({
+            "start_ms": int(round(start * 1000)),
+            "end_ms": int(round(end * 1000)),
+            "text": chunk["text"]
+        })
+    return segments
+
+def _compile_artifact_path(model_name, cache_dir=TORCH_COMPILE_CACHE_DIR):
+    """编译缓存产物文件路径"""
+    return os.path.join(cache_dir, model_name.replace("/", "_") + ".bin")
+
+def enable_compile_cache(model_name, cache_dir=TORCH_COMPILE_CACHE_DIR):
+    """
+    加载上次保存的编译产物，返回产物文件是否已加载
+
+    inductor缓存目录由config在导入torch之前通过环境变量设置。
+    返回True仅表示.bin产物已加载，实际能省下多少编译时间需以编译+预热耗时为准。
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    
+    artifact_path = _compile_artifact_path(model_name, cache_dir)
+    if hasattr(torch.compiler, "load_cache_artifacts") and os.path.exists(artifact_path):
+        try:
+            with open(artifact_path, "rb") as f:
+                torch.compiler.load_cache_artifacts(f.read())
+            print(f"Loaded compile cache: {artifact_path}")
+            return True
+        except Exception as e:
+            print(f"Compile cache load skipped: {e}")
+    
+    return False
+
+def save_compile_cache(model_name, cache_dir=TORCH_COMPILE_CACHE_DIR):
+    """保存本进程的编译产物，供下次启动复用"""
+    if not hasattr(torch.compiler, "save_cache_artifacts"):
+        return
+    
+    try:
+        artifacts = torch.compiler.save_cache_artifacts()
+        if artifacts is not None:
+            with open(_compile_artifact_path(model_name, cache_dir), "wb") as f:
+                f.write(artifacts[0])
+    except Exception as e:
+        print(f"Compile cache save skipped: {e}")
+
+def _compile_with_dynamic_batch(forward):
+    """编译编码器：批次维度动态，其余维度（mel通道、30秒帧数）保持静态"""
+    compiled_forward = torch.compile(forward, mode=TORCH_COMPILE_MODE)
+    
+    def dynamic_batch_forward(input_features, *args, **kwargs):
+        # 批次为1时由dynamo单独特化，预热时已覆盖
+        if input_features.shape[0] > 1:
+            torch._dynamo.mark_dynamic(input_features, 0)
+        return compiled_forward(input_features, *args, **kwargs)
+    
+    return dynamic_batch_forward
 
 class OptimizedWhisperModel:
     def __init__(self, model_config):
@@ -16,6 +85,10 @@ class OptimizedWhisperModel:
         self.model = None
         self.processor = None
         self.pipeline = None
+        self.batched_extractor = None
+        self.compiled = False
+        self.compile_artifact_loaded = False
+        self.compile_time = 0.0
         self.load_model()
     
     def load_model(self):
@@ -33,14 +106,24 @@ class OptimizedWhisperModel:
             
             self.processor = AutoProcessor.from_pretrained(self.config["name"])
             
-            print("Torch compile disabled for speed")
+            if self.config.get("compile", False):
+                self.compile_model()
+            else:
+                print("Torch compile disabled")
+            
+            if self.config.get("batched_features", False):
+                self.batched_extractor = BatchedLogMelExtractor(
+                    self.processor.feature_extractor,
+                    device=self.model.device
+                )
+                print("Batched log-mel feature extraction enabled")
             
             self.pipeline = pipeline(
                 "automatic-speech-recognition",
                 model=self.model,
                 tokenizer=self.processor.tokenizer,
                 feature_extractor=self.processor.feature_extractor,
-                max_new_tokens=200,
+                max_new_tokens=GENERATE_MAX_NEW_TOKENS,
                 batch_size=self.config["batch_size"],
                 torch_dtype=TORCH_DTYPE,
                 return_timestamps=True,
@@ -60,18 +143,128 @@ class OptimizedWhisperModel:
                 ignore_warning=True
             )
     
+    def compile_model(self):
+        """编译编码器和解码器单步，并用代表性批次预热"""
+        cache_dir = self.config.get("compile_cache_dir", TORCH_COMPILE_CACHE_DIR)
+        self.compile_artifact_loaded = enable_compile_cache(self.config["name"], cache_dir)
+        encoder = self.model.get_encoder()
+        decoder = self.model.get_decoder()
+        start_time = time.time()
+        
+        try:
+            # 编码器输入固定为30秒窗口，仅批次维度动态（末尾不满的批次无需重新编译）；
+            # 解码器KV缓存逐步增长，使用动态形状
+            encoder.forward = _compile_with_dynamic_batch(encoder.forward)
+            decoder.forward = torch.compile(decoder.forward, dynamic=True, mode=TORCH_COMPILE_MODE)
+            self.warmup()
+            save_compile_cache(self.config["name"], cache_dir)
+            
+            self.compiled = True
+            self.compile_time = time.time() - start_time
+            print(f"Torch compile enabled, warm-up: {self.compile_time:.1f}s")
+            
+        except Exception as e:
+            print(f"Torch compile failed, using eager mode: {e}")
+            for module in (encoder, decoder):
+                if "forward" in module.__dict__:
+                    del module.forward
+    
+    def warmup(self):
+        """使用单条和满批次的虚拟输入预热模型（批次维度动态，覆盖全部中间批次大小）"""
+        for batch_size in sorted({1, self.config["batch_size"]}):
+            self.run_dummy_batch(batch_size)
+    
+    def run_dummy_batch(self, batch_size, max_new_tokens=COMPILE_WARMUP_TOKENS):
+        """对一批静音特征执行一次完整生成"""
+        feature_extractor = self.processor.feature_extractor
+        input_features = torch.zeros(
+            batch_size,
+            feature_extractor.feature_size,
+            feature_extractor.nb_max_frames,
+            dtype=self.model.dtype,
+            device=self.model.device
+        )
+        
+        with self._inference_context():
+            return self.model.generate(input_features, max_new_tokens=max_new_tokens)
+    
+    def _inference_context(self):
+        """推理上下文：CUDA下使用AMP，CPU下仅关闭梯度"""
+        return torch.amp.autocast('cuda') if torch.cuda.is_available() else torch.no_grad()
+    
     def transcribe(self, audio_path, language="chinese"):
-        """高效转录"""
+        """高效转录，返回 (文本, 毫秒时间戳分段列表)"""
         generate_kwargs = {"language": language} if language != "auto" else {}
         
-        with torch.amp.autocast('cuda') if torch.cuda.is_available() else torch.no_grad():
+        if self.batched_extractor is not None:
+            return self.transcribe_batched(audio_path, generate_kwargs)
+        
+        with self._inference_context():
             result = self.pipeline(
                 audio_path,
                 generate_kwargs=generate_kwargs,
                 return_timestamps=True
             )
         
-        return result["text"]
+        return result["text"], _build_segments(result.get("chunks", []))
+    
+    def _decode_with_offsets(self, token_ids, window_seconds):
+        """解码单个窗口并生成时间戳分段，最后一个时间戳之后被截断的文本单独成段"""
+        tokenizer = self.processor.tokenizer
+        decoded = tokenizer.decode(token_ids, skip_special_tokens=True, output_offsets=True)
+        chunks = list(decoded["offsets"])
+        
+        # output_offsets只覆盖到最后一个时间戳token，达到max_new_tokens上限时其后的文本会丢失
+        token_ids = token_ids.tolist()
+        # 时间戳token紧跟在全部特殊token之后，与transformers的解码逻辑一致
+        timestamp_begin = tokenizer.all_special_ids[-1] + 1
+        timestamp_positions = [i for i, token in enumerate(token_ids) if token >= timestamp_begin]
+        remainder_ids = token_ids[timestamp_positions[-1] + 1:] if timestamp_positions else token_ids
+        remainder = tokenizer.decode(remainder_ids, skip_special_tokens=True)
+        
+        if remainder.strip():
+            last_start, last_end = chunks[-1]["timestamp"] if chunks else (0.0, 0.0)
+            start = last_end if last_end is not None else last_start
+            chunks.append({"timestamp": (start, max(start, window_seconds)), "text": remainder})
+        
+        return decoded["text"], chunks
+    
+    def transcribe_batched(self, audio_path, generate_kwargs):
+        """整批计算log-mel特征，解码方式与pipeline一致（超过30秒时使用long-form顺序解码）"""
+        audio = load_audio(audio_path, self.batched_extractor.sampling_rate)
+        input_features, attention_mask = self.batched_extractor.extract(audio, self.config["batch_size"])
+        tokenizer = self.processor.tokenizer
+        
+        generate_kwargs = dict(generate_kwargs, max_new_tokens=GENERATE_MAX_NEW_TOKENS, return_timestamps=True)
+        if attention_mask is not None:
+            generate_kwargs.update(
+                attention_mask=attention_mask.to(self.model.device),
+                return_segments=True,
+                return_dict_in_generate=True
+            )
+        
+        with self._inference_context():
+            outputs = self.model.generate(
+                input_features.to(self.model.device, self.model.dtype),
+                **generate_kwargs
+            )
+        
+        if attention_mask is not None:
+            # long-form输出的分段时间戳已是整段音频的绝对时间
+            chunks = [
+                {
+                    "timestamp": (float(segment["start"]), float(segment["end"])),
+                    "text": tokenizer.decode(segment["tokens"], skip_special_tokens=True)
+                }
+                for segment in outputs["segments"][0]
+            ]
+            text = "".join(chunk["text"] for chunk in chunks)
+        else:
+            duration = len(audio) / self.batched_extractor.sampling_rate
+            text, chunks = self._decode_with_offsets(outputs[0], duration)
+        
+        # Whisper解码文本自带前导空格，直接拼接即可兼容中英文
+        return text.strip(), _build_segments(chunks)
 
 # 全局模型缓存
 model_instances = {}
@@ -120,7 +313,7 @@ def transcribe_high_utilization(audio_file, model_choice, language="chinese", pr
                 audio_path, 
                 language
             )
-            transcript = transcribe_future.result()
+            transcript, segments = transcribe_future.result()
         
         if preview_mode and audio_path != audio_file:
             try:
@@ -133,14 +326,26 @@ def transcribe_high_utilization(audio_file, model_choice, language="chinese", pr
         
         config = OPTIMIZED_MODELS[model_choice]
         
+        # 仅完整转录写入存档，预览只覆盖前3分钟
+        archive_info = "⚪ 预览模式不存档"
+        if not preview_mode:
+            try:
+                transcript_id = save_transcript(audio_file, config["name"], transcript, segments, language)
+                archive_info = f"✅ 已写入转录库 (#{transcript_id}, {len(segments)}个片段)"
+            except Exception as e:
+                print(f"转录存档失败: {e}")
+                archive_info = f"❌ 存档失败: {e}"
+        
         performance_info = f"""
 ⚡ GPU优化统计:
 • 模型: {model_choice}
 • 批处理大小: {config['batch_size']}
 • 处理时间: {processing_time:.1f}秒
 • 模式: {mode_info}
-• GPU优化: ✅ torch.compile + AMP
-• 并行处理: ✅ 多线程预处理"""
+• 编译优化: {'✅ torch.compile' if model_instance.compiled else '❌ torch.compile 未启用'}
+• 混合精度: {'✅ AMP' if torch.cuda.is_available() else '❌ AMP (CPU模式)'}
+• 并行处理: ✅ 多线程预处理
+• 转录存档: {archive_info}"""
         
         if preview_mode:
             file_size_mb = os.path.getsize(audio_file) / (1024*1024)
@@ -0,0 +1,70 @@
+"""
+批量log-mel特征提取与HF WhisperFeatureExtractor的一致性检查
+"""
+import warnings
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from src.feature_extraction import BatchedLogMelExtractor
+
+TOLERANCE = 1e-3
+
+@pytest.fixture(params=[80, 128], ids=["80mel", "128mel"])
+def feature_extractor(request):
+    return transformers.WhisperFeatureExtractor(feature_size=request.param)
+
+def _random_audio(num_samples, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(num_samples) * 0.1).astype(np.float32)
+
+def test_window_batch_matches_reference(feature_extractor):
+    windows = [
+        _random_audio(feature_extractor.n_samples, seed=1),
+        _random_audio(feature_extractor.n_samples // 3, seed=2),
+    ]
+    reference = feature_extractor(
+        windows,
+        sampling_rate=feature_extractor.sampling_rate,
+        return_tensors="np"
+    ).input_features
+
+    batched = BatchedLogMelExtractor(feature_extractor)(windows).numpy()
+
+    assert batched.shape == reference.shape
+    assert np.abs(batched - reference).max() <= TOLERANCE
+
+def test_long_form_matches_reference(feature_extractor):
+    audio = _random_audio(feature_extractor.n_samples * 2 + 12345, seed=3)
+    reference = feature_extractor(
+        audio,
+        sampling_rate=feature_extractor.sampling_rate,
+        truncation=False,
+        padding="longest",
+        return_tensors="np"
+    ).input_features
+
+    features, attention_mask = BatchedLogMelExtractor(feature_extractor).extract(audio, batch_size=2)
+
+    assert features.shape == reference.shape
+    assert attention_mask.shape[-1] == features.shape[-1]
+    assert np.abs(features.numpy() - reference).max() <= TOLERANCE
+
+def test_read_only_audio_does_not_warn(feature_extractor):
+    audio = np.frombuffer(_random_audio(feature_extractor.n_samples // 2).tobytes(), dtype=np.float32)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        BatchedLogMelExtractor(feature_extractor)([audio])
+
+def test_short_extract_does_not_share_buffer(feature_extractor):
+    extractor = BatchedLogMelExtractor(feature_extractor)
+    first, _ = extractor.extract(_random_audio(feature_extractor.n_samples // 2, seed=4))
+    expected = first.clone()
+
+    extractor.extract(_random_audio(feature_extractor.n_samples // 2, seed=5))
+
+    assert np.array_equal(first.numpy(), expected.numpy())
@@ -0,0 +1,73 @@
+"""
+总结前文本压缩的单元检查
+"""
+import re
+
+import pytest
+
+# config.config 在导入时依赖torch
+pytest.importorskip("torch")
+
+from src.text_compaction import (
+    collapse_repetitions, remove_fillers, deduplicate_sentences,
+    split_sentences, compact_transcript, estimate_tokens
+)
+
+def _without_whitespace(text):
+    return re.sub(r"\s", "", text)
+
+@pytest.mark.parametrize("text, expected", [
+    ("谢谢谢谢谢谢谢谢", "谢谢"),
+    ("好的好的好的好的。", "好的。"),
+    ("very very very good", "very good"),
+    ("哈哈，对对对", "哈哈，对对对"),
+    ("共1000000元，2020年", "共1000000元，2020年"),
+    ("然后......", "然后......"),
+    ("等等——————还有", "等等——————还有"),
+    ("省略……………………", "省略……………………"),
+    ("访问 www.www.www.com 查看", "访问 www.www.www.com 查看"),
+    ("路径 a/a/a/b 不变", "路径 a/a/a/b 不变"),
+])
+def test_collapse_repetitions(text, expected):
+    assert collapse_repetitions(text) == expected
+
+@pytest.mark.parametrize("text, expected", [
+    ("嗯，大家好。", "大家好。"),
+    ("这个金额需要确认，呃，明天再说。", "这个金额需要确认，明天再说。"),
+    ("Um, so the budget is, uh, fine.", "so the budget is, fine."),
+    ("The umbrella is here.", "The umbrella is here."),
+    ("额度和金额都确认了。", "额度和金额都确认了。"),
+    ("他说要辞职了。啊？真的吗？", "他说要辞职了。真的吗？"),
+    ("嗯。我们开始吧。", "我们开始吧。"),
+    ("哦！原来是这样。", "原来是这样。"),
+    ("Right. Um. Next item.", "Right. Next item."),
+])
+def test_remove_fillers(text, expected):
+    assert remove_fillers(text) == expected
+
+def test_deduplicate_sentences_drops_near_duplicates_only():
+    sentences = split_sentences("我们今天讨论预算方案。我们今天讨论预算方案！第一。第一。下面讨论人员安排。")
+
+    assert deduplicate_sentences(sentences) == [
+        "我们今天讨论预算方案。", "第一。", "第一。", "下面讨论人员安排。"
+    ]
+
+@pytest.mark.parametrize("text", [
+    "，".join(f"这是第{i}个没有句号的分句内容" for i in range(5000)),
+    "".join(chr(0x4e00 + i % 2000) for i in range(50000)),
+    " ".join(f"word{i}" for i in range(20000)),
+])
+def test_chunks_respect_token_budget(text):
+    token_budget = 1000
+    result = compact_transcript(text, token_budget=token_budget)
+
+    assert len(result["chunks"]) > 1
+    assert all(estimate_tokens(chunk) <= token_budget for chunk in result["chunks"])
+    assert _without_whitespace("".join(result["chunks"])) == _without_whitespace(result["text"])
+
+def test_within_budget_is_single_chunk():
+    result = compact_transcript("嗯，大家好，欢迎来到今天的会议。谢谢谢谢谢谢谢谢。")
+
+    assert result["chunks"] == [result["text"]]
+    assert result["text"] == "大家好，欢迎来到今天的会议。谢谢。"
+    assert result["saved_tokens"] == result["original_tokens"] - result["compacted_tokens"] > 0
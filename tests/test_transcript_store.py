@@ -0,0 +1,61 @@
+"""
+转录存档的写入替换与全文检索
+"""
+import sqlite3
+
+import pytest
+
+pytest.importorskip("torch")
+
+from src.transcript_store import save_transcript, search_transcripts
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "transcripts.db")
+
+@pytest.fixture
+def source_path(tmp_path):
+    path = tmp_path / "meeting.wav"
+    path.write_bytes(b"RIFF fake audio")
+    return str(path)
+
+def _segments(*texts):
+    return [
+        {"start_ms": i * 1000, "end_ms": (i + 1) * 1000, "text": text}
+        for i, text in enumerate(texts)
+    ]
+
+def _count(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+
+def test_cjk_substring_search(db_path, source_path):
+    save_transcript(source_path, "small", "", _segments("今天我们讨论机器学习的进展", "下午开会"), db_path=db_path)
+
+    hits = search_transcripts("学习", db_path=db_path)
+
+    assert [hit["text"] for hit in hits] == ["今天我们讨论机器学习的进展"]
+    assert hits[0]["start_ms"] == 0 and hits[0]["source_name"] == "meeting.wav"
+
+def test_multi_term_search_requires_all_terms(db_path, source_path):
+    save_transcript(source_path, "small", "", _segments("机器学习入门", "机器翻译质量", "深度学习框架"), db_path=db_path)
+
+    assert [hit["text"] for hit in search_transcripts("机器 学习", db_path=db_path)] == ["机器学习入门"]
+    assert search_transcripts("翻译 框架", db_path=db_path) == []
+
+def test_same_source_and_model_is_replaced(db_path, source_path):
+    save_transcript(source_path, "small", "", _segments("旧的转录内容", "旧的第二段"), db_path=db_path)
+    save_transcript(source_path, "large", "", _segments("另一个模型的结果"), db_path=db_path)
+    save_transcript(source_path, "small", "", _segments("新的转录内容"), db_path=db_path)
+
+    assert search_transcripts("旧的", db_path=db_path) == []
+    assert [hit["model"] for hit in search_transcripts("转录", db_path=db_path)] == ["small"]
+    assert _count(db_path, "transcripts") == 2
+    assert _count(db_path, "segments") == 2
+    assert _count(db_path, "segments_fts") == 2
+
+@pytest.mark.parametrize("query", ['"', "-", "*", "NEAR(", 'a"b', "(", ":", "AND", "OR NOT", "^"])
+def test_fts_syntax_is_treated_as_text(db_path, source_path, query):
+    save_transcript(source_path, "small", "", _segments("普通的一段话"), db_path=db_path)
+
+    assert search_transcripts(query, db_path=db_path) == []